@@ -1,5 +1,7 @@
 """The buffer module assists in iterating through lines and tokens."""
 
+import collections
+import itertools
 import math
 
 class Buffer:
@@ -16,8 +18,10 @@ class Buffer:
     In addition, Buffer provides a current method to look at the
     next item to be supplied, without sequencing past it.
 
-    The __str__ method prints all tokens read so far, up to the end of the
-    current line, and marks the current token with >>.
+    The __str__ method prints the tokens of the last few lines read, up to
+    the end of the current line, and marks the current token with >>.  Only
+    those lines are kept, so reading a long source takes no more memory than
+    reading a short one.
 
     >>> buf = Buffer(iter([['(', '+'], [15], [12, ')']]))
     >>> buf.pop()
@@ -49,7 +53,8 @@ class Buffer:
     """
     def __init__(self, source):
         self.index = 0
-        self.lines = []
+        self.lines = collections.deque(maxlen=4)
+        self.line_count = 0
         self.source = source
         self.current_line = ()
         self.current()
@@ -61,6 +66,12 @@ class Buffer:
         self.index += 1
         return current
 
+    def end_line(self):
+        """Discard the rest of the current line, so that the next item comes
+        from the start of the next line of the source."""
+        self.current_line = ()
+        self.index = 0
+
     @property
     def more_on_line(self):
         return self.index < len(self.current_line)
@@ -72,6 +83,7 @@ class Buffer:
             try:
                 self.current_line = next(self.source)
                 self.lines.append(self.current_line)
+                self.line_count += 1
             except StopIteration:
                 self.current_line = ()
                 return None
@@ -80,13 +92,14 @@ class Buffer:
     def __str__(self):
         """Return recently read contents; current element marked with >>."""
         # Format string for right-justified line numbers
-        n = len(self.lines)
+        n = self.line_count
         msg = '{0:>' + str(math.floor(math.log10(n))+1) + "}: "
 
         # Up to three previous lines and current line are included in output
         s = ''
-        for i in range(max(0, n-4), n-1):
-            s += msg.format(i+1) + ' '.join(map(str, self.lines[i])) + '\n'
+        previous = itertools.islice(self.lines, len(self.lines) - 1)
+        for i, line in enumerate(previous, n - len(self.lines) + 1):
+            s += msg.format(i) + ' '.join(map(str, line)) + '\n'
         s += msg.format(n)
         s += ' '.join(map(str, self.current_line[:self.index]))
         s += ' >> '
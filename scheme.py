@@ -1,6 +1,8 @@
 """This module implements the core Scheme interpreter functions, including the
 eval/apply mutual recurrence, environment model, and read-eval-print loop.
 """
+import functools
+import inspect
 from scheme_primitives import *
 from scheme_reader import *
 from ucb import main, trace
@@ -21,49 +23,52 @@ def scheme_eval(expr, env):
     """
 
     while env is not None:
-        # Note: until extra-credit problem 22 is complete, env will
-        # always be None on the second iteration of the loop, so that
-        # the value of EXPR is returned at that point.
+        # Special forms and procedure applications hand back an (expr, env)
+        # pair instead of recursing, so tail positions are evaluated by
+        # this loop.  The loop ends once some step returns (value, None).
 
         if expr is None:
             raise SchemeError("Cannot evaluate an undefined expression.")
 
-        # Evaluate Atoms
-        if scheme_symbolp(expr):
-            expr, env = env.lookup(expr).get_actual_value(), None
-        elif scheme_atomp(expr):
+        # Evaluate Atoms.  Variable references are the most common
+        # expressions, so the search of Frame.lookup is inlined here.
+        if type(expr) is SchemeSymbol:
+            frame = env
+            while frame is not None:
+                bindings = frame.bindings
+                if expr in bindings:
+                    break
+                frame = frame.parent
+            else:
+                raise SchemeError("unknown identifier: {0}".format(str(expr)))
+            expr, env = bindings[expr].get_actual_value(), None
+        elif type(expr) is not Pair:
             env = None
 
-        # All non-atomic expressions are lists.
-        elif not scheme_listp(expr):
-            raise SchemeError("malformed list: {0}".format(str(expr)))
+        # All non-atomic expressions are lists.  as_tuple() checks that once
+        # per expression and caches the result, so re-evaluating the same
+        # program text does not walk the list again.
         else:
-            first, rest = scheme_car(expr), scheme_cdr(expr)
-
-            # Evaluate Combinations
-            if (scheme_symbolp(first) # first might be unhashable
-                and first in SPECIAL_FORMS):
-                if proper_tail_recursion:
-                    expr, env = SPECIAL_FORMS[first](rest, env)
-                else:
-                    expr, env = SPECIAL_FORMS[first](rest, env)
-                    expr, env = scheme_eval(expr, env), None
+            try:
+                expr.as_tuple()
+            except SchemeError:
+                raise SchemeError("malformed list: {0}".format(str(expr)))
+            first, rest = expr.first, expr.second
+
+            # Evaluate Combinations.  Only symbols can name special forms;
+            # each symbol carries its handler (see SPECIAL_FORMS below).
+            if type(first) is SchemeSymbol:
+                special_form = first.special_form
+            else:
+                special_form = None
+            if special_form is not None:
+                expr, env = special_form(rest, env)
             else:
                 procedure = scheme_eval(first, env)
                 args = procedure.evaluate_arguments(rest, env)
-                if proper_tail_recursion:
-                    expr, env = procedure.apply(args, env)
-                else:
-                    # UPDATED 4/14/2014 @ 19:08
-                    expr, env = scheme_apply(procedure, args, env), None
+                expr, env = procedure.apply(args, env)
     return expr
 
-proper_tail_recursion = False
-################################################################
-# Uncomment the following line to apply tail call optimization #
-################################################################
-proper_tail_recursion = True
-
 def scheme_apply(procedure, args, env):
     """Apply PROCEDURE (type Procedure) to argument values ARGS
     in environment ENV.  Returns the resulting Scheme value."""
@@ -81,17 +86,28 @@ def scheme_apply(procedure, args, env):
 class Frame:
     """An environment frame binds Scheme symbols to Scheme values."""
 
+    __slots__ = ('bindings', 'parent')
+
     def __init__(self, parent):
         """An empty frame with a PARENT frame (that may be None)."""
         self.bindings = {}
         self.parent = parent
 
     def __repr__(self):
+        if self.parent is None:
+            return "<Global Frame>"
+        else:
+            return "<Frame @{0:x} n={1}>".format(id(self), len(self.bindings))
+
+    def pretty(self):
+        """A string showing the bindings of SELF and of each enclosing frame,
+        up to (but not including the contents of) the global frame.  Unlike
+        repr, this formats every binding along the parent chain."""
         if self.parent is None:
             return "<Global Frame>"
         else:
             s = sorted('{0}: {1}'.format(k,v) for k,v in self.bindings.items())
-            return "<{{{0}}} -> {1}>".format(', '.join(s), repr(self.parent))
+            return "<{{{0}}} -> {1}>".format(', '.join(s), self.parent.pretty())
 
     def __eq__(self, other):
         return isinstance(other, Frame) and \
@@ -101,15 +117,17 @@ class Frame:
         """Return the value bound to SYMBOL.  Errors if SYMBOL is not found.
         As a convenience, also accepts Python strings, which it turns into
         symbols."""
+        e = self
+        while e is not None:
+            bindings = e.bindings
+            if symbol in bindings:
+                return bindings[symbol]
+            e = e.parent
+        # Strings never match symbol keys, so they are converted only after
+        # the fast search has failed.
         if type(symbol) is str:
-            symbol = intern(symbol)
-        if symbol in self.bindings:
-            return self.bindings[symbol]
-        elif self.parent:
-            return Frame.lookup(self.parent,symbol)
-        else:        
-            raise SchemeError("unknown identifier: {0}".format(str(symbol)))
-
+            return self.lookup(intern(symbol))
+        raise SchemeError("unknown identifier: {0}".format(str(symbol)))
 
     def global_frame(self):
         """The global environment at the root of the parent chain."""
@@ -126,16 +144,20 @@ class Frame:
 
         >>> env = create_global_frame()
         >>> formals, vals = read_line("(a b c)"), read_line("(1 2 3)")
-        >>> env.make_call_frame(formals, vals)
+        >>> print(env.make_call_frame(formals, vals).pretty())
         <{a: 1, b: 2, c: 3} -> <Global Frame>>
         """
-        frame = Frame(self)
-        if len(formals) == len(vals):
-            while formals !=nil and vals!=nil:
-                frame.define(scheme_car(formals), scheme_car(vals))
-                formals, vals =scheme_cdr(formals), scheme_cdr(vals)
-        else:
+        formals, vals = formals.as_tuple(), vals.as_tuple()
+        if len(formals) != len(vals):
             raise SchemeError('different number of formal parameters and arguments')
+        return self.extend(formals, vals)
+
+    def extend(self, symbols, values):
+        """Return a new frame whose parent is SELF, binding each symbol in the
+        sequence SYMBOLS to the corresponding value in the sequence VALUES.
+        The two sequences must have the same length."""
+        frame = Frame(self)
+        frame.bindings = dict(zip(symbols, values))
         return frame
 
     def define(self, sym, val):
@@ -147,6 +169,11 @@ class Frame:
             sym = intern(sym)
         self.bindings[sym] = val
 
+    def bind(self, sym, val):
+        """Bind the Scheme symbol SYM to VAL in SELF.  Unlike define, SYM
+        must already be a symbol; this is the form the interpreter uses."""
+        self.bindings[sym] = val
+
 #####################
 # Procedures        #
 #####################
@@ -154,6 +181,8 @@ class Frame:
 class Procedure(SchemeValue):
     """The superclass of all kinds of procedure in Scheme."""
 
+    __slots__ = ()
+
     # Arcane Technical Note: The odd placement of the import from scheme in
     # evaluate_arguments is necessary because it introduces mutually recursive
     # imports between this file and scheme.py.  The effect of putting it
@@ -164,14 +193,18 @@ class Procedure(SchemeValue):
         """Evaluate the expressions in ARG_LIST in ENV to produce
         arguments for this procedure. Default definition for procedures."""
         from scheme import scheme_eval
-        return arg_list.map(lambda operand: scheme_eval(operand, env))
+        return scheme_list(*[scheme_eval(operand, env)
+                             for operand in arg_list.as_tuple()])
 
 class PrimitiveProcedure(Procedure):
     """A Scheme procedure defined as a Python function."""
 
+    __slots__ = ('fn', 'use_env', '_nargs')
+
     def __init__(self, fn, use_env=False):
         self.fn = fn
         self.use_env = use_env
+        self._nargs = None if use_env else _fixed_arity(fn)
 
     def __str__(self):
         return '#[primitive]'
@@ -188,20 +221,46 @@ class PrimitiveProcedure(Procedure):
         (scnum(4), None)
         """
         try:
-            args_list = list(args)
+            # Most primitives take one or two arguments; read those straight
+            # out of ARGS instead of converting the list to a tuple.
+            nargs = self._nargs
+            if nargs == 1:
+                if type(args) is Pair and args.second is nil:
+                    return self.fn(args.first), None
+            elif nargs == 2 and type(args) is Pair:
+                rest = args.second
+                if type(rest) is Pair and rest.second is nil:
+                    return self.fn(args.first, rest.first), None
+            args_list = args.as_tuple()
             if self.use_env:
-                args_list.append(env)
+                args_list += (env,)
             val = self.fn(*args_list)
 
         except TypeError as err:
             raise SchemeError(err)
         return val, None
 
+@functools.lru_cache(maxsize=None)
+def _fixed_arity(fn):
+    """The number of arguments FN takes, if it takes exactly that many
+    positional arguments, and otherwise None."""
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    for param in params:
+        if (param.kind not in (param.POSITIONAL_ONLY,
+                               param.POSITIONAL_OR_KEYWORD)
+            or param.default is not param.empty):
+            return None
+    return len(params)
 
 
 class LambdaProcedure(Procedure):
     """A procedure defined by a lambda expression or the complex define form."""
 
+    __slots__ = ('formals', 'body', 'env', '_formal_syms', '_arity')
+
     def __init__(self, formals, body, env = None):
         """A procedure whose formal parameter list is FORMALS (a Scheme list),
         whose body is the single Scheme expression BODY, and whose parent
@@ -211,6 +270,16 @@ class LambdaProcedure(Procedure):
         self.formals = formals
         self.body = body
         self.env = env
+        self._formal_syms = formals.as_tuple()
+        self._arity = len(self._formal_syms)
+
+    def _call_frame(self, parent, args):
+        """A new frame extending PARENT in which the formals of this
+        procedure are bound to the values in the Scheme list ARGS."""
+        vals = args.as_tuple()
+        if len(vals) != self._arity:
+            raise SchemeError('different number of formal parameters and arguments')
+        return parent.extend(self._formal_syms, vals)
 
     def _symbol(self):
         return 'lambda'
@@ -232,13 +301,9 @@ class LambdaProcedure(Procedure):
                self.env == other.env
 
     def apply(self, args, env):
-        if proper_tail_recursion:
-            # Implemented in Question 22.
-            new_env = self.env.make_call_frame(self.formals, args)
-            return self.body, new_env
-        else:
-            new_env = self.env.make_call_frame(self.formals, args)
-            return scheme_eval(self.body,new_env), None
+        """Bind ARGS in a new frame extending the defining environment and
+        return (BODY, frame) for scheme_eval to continue with."""
+        return self.body, self._call_frame(self.env, args)
 
 
 class MuProcedure(LambdaProcedure):
@@ -253,22 +318,22 @@ class MuProcedure(LambdaProcedure):
                     ||     ||
     """
 
+    __slots__ = ()
+
     def _symbol(self):
         return 'mu'
 
     def apply(self, args, env):
-        if proper_tail_recursion:
-            # Implemented in Question 22.
-            new_env = env.make_call_frame(self.formals, args)
-            return self.body, new_env
-        else:
-            new_env = env.make_call_frame(self.formals, args)
-            return scheme_eval(self.body,new_env), None
+        """Bind ARGS in a new frame extending the calling environment ENV."""
+        return self.body, self._call_frame(env, args)
 
 
 # Call-by-name (nu) extension.
 class NuProcedure(LambdaProcedure):
     """A procedure whose parameters are to be passed by name."""
+
+    __slots__ = ()
+
     def _symbol(self):
         return 'nu'
 
@@ -282,6 +347,8 @@ class Thunk(LambdaProcedure):
     """A by-name value that is to be called as a parameterless function when
     its value is fetched to be used."""
 
+    __slots__ = ()
+
     def get_actual_value(self):
         return scheme_eval(self.body, self.env)
 
@@ -335,7 +402,7 @@ def do_define_form(vals, env):
     if scheme_symbolp(target):     # for assigning values
         check_form(vals, 2, 2)
         value = scheme_eval(vals[1], env)
-        env.define(target, value)
+        env.bind(target, value)
         return target, None
     elif scheme_pairp(target):     # for defining functions
         formals = scheme_cdr(target)
@@ -343,7 +410,7 @@ def do_define_form(vals, env):
         if scheme_symbolp(func_name):
             body = scheme_cdr(vals)
             value = do_lambda_form(scheme_cons(formals,body),env)[0]
-            env.define(func_name, value)
+            env.bind(func_name, value)
             return func_name, None     # or None
         else:
             raise SchemeError("bad variable")
@@ -359,25 +426,25 @@ def do_quote_form(vals, env):
 def do_let_form(vals, env):
     """Evaluate a let form with parameters VALS in environment ENV."""
     check_form(vals, 2)
-    bindings = vals[0] #the local variable binding
-    exprs = vals.second #the action
-    if not scheme_listp(bindings):
+    try:
+        bindings = vals.first.as_tuple() #the local variable binding
+    except SchemeError:
         raise SchemeError("bad bindings list in let form")
+    exprs = vals.second.as_tuple() #the action
 
     # Add a frame containing bindings
-    names, values = nil, nil
+    names, values = [], []
     for binding in bindings:
         check_form(binding, 2)
-        names= Pair(binding[0], names)
-        values = Pair(scheme_eval(binding[1], env),values)
+        names.append(binding.first)
+        values.append(scheme_eval(binding.second.first, env))
     #Check if duplicate bindings
-    check_formals(names) 
-    new_env = env.make_call_frame(names, values)
+    check_formals(names)
+    new_env = env.extend(names, values)
     # Evaluate all but the last expression after bindings, and return the last
-    last = len(exprs)-1
-    for i in range(0, last):
-        scheme_eval(exprs[i], new_env)
-    return exprs[last], new_env
+    for expr in exprs[:-1]:
+        scheme_eval(expr, new_env)
+    return exprs[-1], new_env
 
 
 #########################
@@ -411,13 +478,14 @@ def do_if_form(vals, env):
 
 def do_and_form(vals, env):
     """Evaluate short-circuited and with parameters VALS in environment ENV."""
-    if len(vals) == 0:
+    exprs = vals.as_tuple()
+    if len(exprs) == 0:
         return scheme_true, None
-    for i in range(len(vals)-1):
-        predicate = scheme_eval(vals[i], env)
+    for expr in exprs[:-1]:
+        predicate = scheme_eval(expr, env)
         if not predicate:
             return scheme_false, None
-    return vals[len(vals)-1], env
+    return exprs[-1], env
 
 def quote(value):
     """Return a Scheme expression quoting the Scheme VALUE.
@@ -432,41 +500,77 @@ def quote(value):
 
 def do_or_form(vals, env):
     """Evaluate short-circuited or with parameters VALS in environment ENV."""
-    if len(vals) == 0:
+    exprs = vals.as_tuple()
+    if len(exprs) == 0:
         return scheme_false, None
-    for i in range(len(vals)-1):
-        predicate = scheme_eval(vals[i], env)
+    for expr in exprs[:-1]:
+        predicate = scheme_eval(expr, env)
         if predicate:
             return predicate, None 
-    return vals[len(vals)-1], env
+    return exprs[-1], env
 
 def do_cond_form(vals, env):
-    """Evaluate cond form with parameters VALS in environment ENV."""
+    """Evaluate cond form with parameters VALS in environment ENV.  Its
+    clauses are lowered once, and again after any Pair is changed.
+
+    >>> env = create_global_frame()
+    >>> expr = read_line("(cond ((= 1 2) 'a) (else 'b))")
+    >>> scheme_eval(expr, env)
+    intern('b')
+    >>> expr.second.first.set_car(read_line("(= 1 1)"))
+    okay
+    >>> scheme_eval(expr, env)
+    intern('a')
+    """
+    if type(vals) is Pair:
+        clauses = vals.lowered(lower_cond_clauses)
+    else:
+        clauses = lower_cond_clauses(vals)
+    for test, body in clauses:
+        if test is None:
+            raise SchemeError(body)
+        if test is not scheme_true:
+            test = scheme_eval(test, env)
+        if test:
+            if body is nil:
+                return test, None
+            return do_begin_form(body, env)
+    return okay, None
+
+def lower_cond_clauses(vals):
+    """The clauses of a cond form with parameters VALS, as a tuple of
+    (test, body) pairs.  An else clause gets the test #t.  A badly formed
+    clause becomes (None, message) and ends the tuple, so that its error is
+    raised only if evaluation gets that far."""
     num_clauses = len(vals)
-    for i, clause in enumerate(vals):
-        check_form(clause, 1)
+    clauses = []
+    for i, clause in enumerate(vals.as_tuple()):
+        try:
+            check_form(clause, 1)
+        except SchemeError as err:
+            clauses.append((None, str(err)))
+            break
         if clause.first is else_sym:
             if i < num_clauses-1:
-                raise SchemeError("else must be last")
-            test = scheme_true
+                clauses.append((None, "else must be last"))
+                break
             if clause.second is nil:
-                raise SchemeError("badly formed else clause")
+                clauses.append((None, "badly formed else clause"))
+                break
+            clauses.append((scheme_true, clause.second))
         else:
-            test = scheme_eval(clause.first, env)
-        if test:
-            if clause.second is nil:
-                return test, None
-            return do_begin_form(clause.second, env)
-    return okay, None
+            clauses.append((clause.first, clause.second))
+    return tuple(clauses)
 
 def do_begin_form(vals, env):
     """Evaluate begin form with parameters VALS in environment ENV."""
     check_form(vals, 0)
     if scheme_nullp(vals):
         return okay, None
-    for i in range(len(vals)-1):
-        result = scheme_eval(vals[i], env)
-    return vals[len(vals)-1], env
+    exprs = vals.as_tuple()
+    for expr in exprs[:-1]:
+        scheme_eval(expr, env)
+    return exprs[-1], env
 
 
  
@@ -506,15 +610,23 @@ SPECIAL_FORMS = {
         quote_sym:        do_quote_form,
 }
 
+# Record each handler on its (interned) symbol as well, so that scheme_eval
+# can find it with an attribute read instead of a dictionary lookup.
+for _sym, _form in SPECIAL_FORMS.items():
+    _sym.special_form = _form
+
 # Utility methods for checking the structure of Scheme programs
 
 def check_form(expr, min, max = None):
     """Check EXPR (default SELF.expr) is a proper list whose length is
     at least MIN and no more than MAX (default: no maximum). Raises
     a SchemeError if this is not the case."""
-    if not scheme_listp(expr):
+    # The cached tuple from as_tuple makes both the well-formedness check
+    # and the length O(1) after the first time a form is checked.
+    try:
+        length = len(expr.as_tuple())
+    except SchemeError:
         raise SchemeError("badly formed expression: " + str(expr))
-    length = len(expr)
     if length < min:
         raise SchemeError("too few operands in form")
     elif max is not None and length > max:
@@ -555,10 +667,7 @@ def read_eval_print_loop(next_line, env, quiet=False, startup=False,
                 if not quiet and result is not None:
                     scheme_print(result)
         except (SchemeError, SyntaxError, ValueError, RuntimeError) as err:
-            if (isinstance(err, RuntimeError) and
-                'maximum recursion depth exceeded' not in err.args[0]):
-                raise
-            print("Error:", err)
+            report_error(err)
         except KeyboardInterrupt:  # <Control>-C
             if not startup:
                 raise
@@ -568,6 +677,36 @@ def read_eval_print_loop(next_line, env, quiet=False, startup=False,
         except EOFError:  # <Control>-D, etc.
             return
 
+def run_expressions(lines, env, quiet=True):
+    """Read and evaluate all expressions in LINES, a list of strings, in ENV,
+    printing their values unless QUIET.  As in read_eval_print_loop, an
+    error is reported and the rest of the line on which it occurred is
+    skipped, but a single Buffer reads the whole of LINES."""
+    tokens = tokenize_lines(lines)
+    src = None
+    while True:
+        try:
+            if src is None:
+                src = Buffer(tokens)
+            while True:
+                result = scheme_eval(scheme_read(src), env)
+                if not quiet and result is not None:
+                    scheme_print(result)
+        except (SchemeError, SyntaxError, ValueError, RuntimeError) as err:
+            report_error(err)
+            if src is not None:
+                src.end_line()
+        except EOFError:
+            return
+
+def report_error(err):
+    """Print ERR, an error raised while reading or evaluating an expression.
+    A RuntimeError other than recursion overflow is re-raised."""
+    if (isinstance(err, RuntimeError) and
+        'maximum recursion depth exceeded' not in err.args[0]):
+        raise err
+    print("Error:", err)
+
 
 def scheme_load(*args):
     """Load a Scheme source file. ARGS should be of the form (SYM, ENV) or (SYM,
@@ -584,10 +723,14 @@ def scheme_load(*args):
     check_type(sym, scheme_symbolp, 0, "load")
     with scheme_open(str(sym)) as infile:
         lines = infile.readlines()
-    args = (lines, None) if quiet else (lines,)
-    def next_line():
-        return buffer_lines(*args)
-    read_eval_print_loop(next_line, env.global_frame(), quiet=quiet)
+    if quiet:
+        run_expressions(lines, env.global_frame())
+    else:
+        # Echoed input needs a fresh prompt for each line, which
+        # read_eval_print_loop provides.
+        def next_line():
+            return buffer_lines(lines)
+        read_eval_print_loop(next_line, env.global_frame(), quiet=quiet)
     return okay
 
 def scheme_open(filename):
@@ -606,14 +749,14 @@ def scheme_open(filename):
 def create_global_frame():
     """Initialize and return a single-frame environment with built-in names."""
     env = Frame(None)
-    env.define("eval", PrimitiveProcedure(scheme_eval, True))
-    env.define("apply", PrimitiveProcedure(scheme_apply, True))
-    env.define("load", PrimitiveProcedure(scheme_load, True))
+    env.bind(intern("eval"), PrimitiveProcedure(scheme_eval, True))
+    env.bind(intern("apply"), PrimitiveProcedure(scheme_apply, True))
+    env.bind(intern("load"), PrimitiveProcedure(scheme_load, True))
 
     for names, fn in get_primitive_bindings():
         for name in names:
             proc = PrimitiveProcedure(fn)
-            env.define(name, proc)
+            env.bind(intern(name), proc)
     return env
 
 @main
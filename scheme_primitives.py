@@ -1,10 +1,10 @@
 """This module implements the primitives of the Scheme language."""
 
+import functools
 import math
 import operator
 import sys
 import numbers
-import re
 
 try:
     import turtle
@@ -60,7 +60,9 @@ class SchemeValue:
     """The parent class of all Scheme values manipulated by the interpreter.
     The methods here give default implementations, and are overridden in the
     subclasses of SchemeValue."""
-    
+
+    __slots__ = ()
+
     def __bool__(self):
         """True if I am supposed to count as a "true value" in Python.  This
         is the method used by Python's conditionals (if, and, or, not, while)
@@ -111,6 +113,11 @@ class SchemeValue:
     def length(self):
         bad_type(self, 0, "length")
 
+    def as_tuple(self):
+        """The elements of a Scheme list as a Python tuple.  Only lists
+        have elements."""
+        raise SchemeError("ill-formed list")
+
     def neg(self):
         """Unary negation (as in -x), returning a SchemeValue."""
         bad_type(self, 0, "sub")
@@ -226,6 +233,9 @@ def scheme_coerce(x):
 
 class okay(SchemeValue):
     """Signifies an undefined value."""
+
+    __slots__ = ()
+
     def __repr__(self):
         return "okay"
 
@@ -236,6 +246,8 @@ okay = okay() # Assignment hides the okay class; there is only one instance
 ############
 
 class scheme_true(SchemeValue):
+    __slots__ = ()
+
     def booleanp(self):
         return scheme_true
 
@@ -246,6 +258,8 @@ class scheme_true(SchemeValue):
         return "#t"
 
 class scheme_false(SchemeValue):
+    __slots__ = ()
+
     def __bool__(self):
         return False
 
@@ -264,11 +278,11 @@ class scheme_false(SchemeValue):
 scheme_true = scheme_true()
 scheme_false = scheme_false()
 
-def scbool(x):
+def scbool(x, _true=scheme_true, _false=scheme_false):
     """The Scheme boolean value (#t or #f) that corresponds to the Python value
     X.  True Python values yield scheme_true, and false values yield
-    scheme_false."""
-    return scheme_true if x else scheme_false
+    scheme_false.  (_TRUE and _FALSE only make the two values local.)"""
+    return _true if x else _false
 
 ###########
 # Numbers #
@@ -281,7 +295,9 @@ def _check_num(x, name):
 
 class SchemeNumber(SchemeValue):
     """The parent class of all Scheme numeric types."""
-    
+
+    __slots__ = ()
+
     def numberp(self):
         return scheme_true
 
@@ -313,36 +329,45 @@ class SchemeNumber(SchemeValue):
 # That is, they inherits methods from both SchemeValue and int or float.
 # Thus, SchemeInts print as integers, and respond to all the
 # same operators (+, -, etc.) as integers.  To convert an ordinary Python
-# integer, x, into a SchemeInt, use SchemeInt(x); likewise for SchemeFloat.
+# integer, x, into a SchemeInt, use scint(x) (below); for SchemeFloat, use
+# SchemeFloat(x).
 
 class SchemeInt(SchemeNumber, int):
+    __slots__ = ()
+
+    def __new__(cls, value=0, *args):
+        """The SchemeInt for VALUE, converted as int(VALUE, *ARGS) would be.
+        Small int values give the shared instance from _SMALL_INT_CACHE.
+
+        >>> scint(7) is scint(7)
+        True
+        >>> scint(2.0), scint(5000.7), scint("3")
+        (scnum(2), scnum(5000), scnum(3))
+        >>> isinstance(scint(7), scint)
+        True
+        """
+        if (cls is SchemeInt and type(value) is int and
+            _SMALL_INT_MIN <= value <= _SMALL_INT_MAX):
+            return _SMALL_INT_CACHE[value - _SMALL_INT_MIN]
+        return int.__new__(cls, value, *args)
+
     def integerp(self):
         return scheme_true
 
     def neg(self):
-        return SchemeInt(-self)
+        return scint(-self)
 
-    # Scheme quotient rounds toward 0; Pythons rounds toward negative infinity.
     def quo(self, y):
         check_type(y, scheme_integerp, 1, "quotient")
-        try:
-            if (y < 0) != (self < 0):
-                return SchemeInt(- (abs(self) // abs(y)))
-            else:
-                return SchemeInt(self // y)
-        except ZeroDivisionError as err:
-            raise SchemeError(err)
+        return _int_quo(self, y)
 
     def modulo(self, y):
         check_type(y, scheme_integerp, 1, "modulo")
-        try:
-            return SchemeInt(self % y)
-        except ZeroDivisionError as err:
-            raise SchemeError(err)
+        return _int_modulo(self, y)
 
     def rem(self, y):
-        q = self.quo(y)
-        return SchemeInt(self - q * y)
+        check_type(y, scheme_integerp, 1, "quotient")
+        return _int_rem(self, y)
 
     def floor(self):
         return self
@@ -359,25 +384,65 @@ class SchemeInt(SchemeNumber, int):
     def oddp(self):
         return scbool(self % 2 == 1)
 
+# Integer division for two Scheme integers, shared by the methods above and
+# the fast paths in the quotient, modulo, and remainder primitives.
+
+# Scheme quotient rounds toward 0; Pythons rounds toward negative infinity.
+def _int_quo(x, y):
+    try:
+        # X ^ Y is negative exactly when the signs of X and Y differ.
+        return scint(-(-x // y) if (x ^ y) < 0 else x // y)
+    except ZeroDivisionError as err:
+        raise SchemeError(err)
+
+def _int_modulo(x, y):
+    try:
+        return scint(x % y)
+    except ZeroDivisionError as err:
+        raise SchemeError(err)
+
+def _int_rem(x, y):
+    q = _int_quo(x, y)
+    return scint(x - q * y)
+
 class SchemeFloat(SchemeNumber, float):
+    __slots__ = ()
+
     def neg(self):
         return SchemeFloat(-self)
 
     def floor(self):
-        return SchemeInt(int(math.floor(self)))
+        return scint(math.floor(self))
 
     def ceil(self):
-        return SchemeInt(int(math.ceil(self)))
+        return scint(math.ceil(self))
 
     def eqvp(self, y):
         return scbool(self == y)
 
 # Shorthand for numeric types.
 
-scint = SchemeInt
 scfloat = SchemeFloat
 
+# The exact types of Scheme numbers.  Primitives that see only these types
+# may operate on them directly, skipping method dispatch and type checks.
+_NUMBER_TYPES = frozenset((SchemeInt, SchemeFloat))
+
+# Like CPython's own small ints, Scheme integers in this range are created
+# once, so reading or computing them does not allocate a new object.
+_SMALL_INT_MIN, _SMALL_INT_MAX = -128, 1024
+_SMALL_INT_CACHE = [int.__new__(SchemeInt, i)
+                    for i in range(_SMALL_INT_MIN, _SMALL_INT_MAX + 1)]
+
+scint = SchemeInt
+
 def scnum(num):
+    """The Scheme number with value NUM: a SchemeInt if NUM is integral and a
+    SchemeFloat otherwise.
+
+    >>> scnum(3) is scnum(3.0)
+    True
+    """
     r = round(num)
     if r == num:
         return scint(r)
@@ -395,18 +460,25 @@ class SchemeSymbol(SchemeValue):
     that SchemeSymbols are hashable (so may be used as dictionary keys and
     in sets)."""
 
+    __slots__ = ('name', 'special_form', '_interned')
+
     def __init__(self, name):
         """A new symbol whose name is NAME. Normally, you should create new
         symbols with intern (below).  This function is for internal use."""
         assert type(name) is str, \
                "invalid type of symbol name: {}".format(type(name))
         self.name = name
+        # The handler for the special form this symbol names, if any.  The
+        # evaluator fills this in from its table of special forms.
+        self.special_form = None
+        # Whether this is the canonical symbol for its name; set by intern.
+        self._interned = False
 
     def symbolp(self):
         return scheme_true
 
     def __repr__(self):
-        if self is _all_symbols.get(self.name, None):
+        if self._interned:
             return "intern('{}')".format(self.name)
         else:
             return "SchemeSymbol('{}')".format(self.name)
@@ -414,45 +486,42 @@ class SchemeSymbol(SchemeValue):
     def __str__(self):
         return self.name
 
+    def print_repr(self):
+        return self.name
+
 # The symbols corresponding to each unique symbol name.
 _all_symbols = {}
 
 def intern(name):
     """If NAME is a string, the canonical symbol named NAME.  If NAME is a
     symbol, a canonical symbol with that name."""
-    if isinstance(name, SchemeSymbol):
-        if str(name) in _all_symbols:
-            return _all_symbols[str(name)]
-        else:
-            _all_symbols[str(name)] = name
-            return name
-    if name in _all_symbols:
-        return _all_symbols[name]
-    else:
-        sym = SchemeSymbol(name)
-        _all_symbols[name] = sym
+    if type(name) is SchemeSymbol:
+        sym = _all_symbols.setdefault(name.name, name)
+        sym._interned = True
         return sym
+    sym = _all_symbols.get(name)
+    if sym is None:
+        sym = _all_symbols[name] = SchemeSymbol(name)
+        sym._interned = True
+    return sym
 
 ###########
 # Strings #
 ###########
 
 class SchemeStr(SchemeValue, str):
+    __slots__ = ()
+
     def stringp(self):
         return scheme_true
 
     def __repr__(self):
         return "scstr({!r})".format(str(self))
 
-    _escape = re.compile(r'''"|\.''')
-
     def print_repr(self):
         s = str.__repr__(self)
         if s[0] == "'":
-            s = s[1:-1]
-            s = SchemeStr._escape.sub(lambda x: (r'\"' if x == '"' 
-                                                 else "'" if x == r"\'"
-                                                 else x), s)
+            s = s[1:-1].replace(r"\'", "'").replace('"', r'\"')
             s = '"' + s + '"'
         return s
 
@@ -471,6 +540,12 @@ class Pair(SchemeValue):
     must convert explictly, generally using intern).  Likewise, the __repr__
     function will abbreviate scnum(x) to x and scstr(x) to x.
 
+    Once a Pair is built, change its first and second only with set_car and
+    set_cdr.  as_tuple and lowered cache facts about the whole list starting
+    at a Pair, and only those two methods tell the caches that some Pair in
+    a list has changed.  Assigning to first or second directly is not
+    supported.
+
     >>> s = Pair(1, Pair(2, nil))
     >>> s
     Pair(1, Pair(2, nil))
@@ -482,7 +557,24 @@ class Pair(SchemeValue):
     scnum(2)
     >>> print(s.map(lambda x: x+4))
     (5 6)
+
+    Comparing and mapping walk a list in a loop, so long lists are fine.
+
+    >>> a = scheme_list(*map(scint, range(10000)))
+    >>> b = scheme_list(*map(scint, range(10000)))
+    >>> a == b, a.map(lambda x: x+1) == b.map(lambda x: x+1)
+    (True, True)
+    >>> a == b.map(lambda x: x+1)
+    False
     """
+
+    __slots__ = ('first', 'second', '_tuple', '_lowered')
+
+    # The caches in _tuple and _lowered describe the whole list that starts
+    # at a Pair, so changing any later Pair can make them stale.  Each is
+    # stored with the count of mutations made through set_car and set_cdr
+    # when it was built, and is used only while that count is unchanged.
+
     def __init__(self, first, second):
         """The pair (FIRST . SECOND).  As a convenience, FIRST and SECOND
         are coerced from Python numbers to SchemeNumbers or from Python
@@ -496,6 +588,8 @@ class Pair(SchemeValue):
             
         self.first = first
         self.second = second
+        self._tuple = None
+        self._lowered = None
 
     def atomp(self):
         return scheme_false
@@ -510,15 +604,26 @@ class Pair(SchemeValue):
         return self.second
 
     def set_car(self, v):
+        global _pair_mutations
         self.first = v
+        _pair_mutations += 1
         return okay
 
     def set_cdr(self, v):
+        global _pair_mutations
         self.second = v
+        _pair_mutations += 1
         return okay
 
     def length(self):
-        return SchemeInt(self.__len__())
+        # Lists that are data rather than program text are counted, not
+        # cached by as_tuple.
+        if not self.listp():
+            raise SchemeError("length attempted on improper list")
+        n, p = 1, self.second
+        while p is not nil:
+            n, p = n + 1, p.second
+        return scint(n)
 
     def equalp(self, y):
         return scbool(self == y)
@@ -533,9 +638,9 @@ class Pair(SchemeValue):
         repeated pair in the list."""
         p0 = self
         p1 = self.second
-        while p1 is not p0 and p1.pairp():
+        while p1 is not p0 and type(p1) is Pair:
             p1 = p1.second
-            if p1 is p0 or not p1.pairp():
+            if p1 is p0 or type(p1) is not Pair:
                 break
             p0 = p0.second
         return p1
@@ -552,23 +657,63 @@ class Pair(SchemeValue):
                                            uncoerce(self.second))
 
     def __str__(self):
-        s = "(" + str(self.first)
+        items = [str(self.first)]
         second = self.second
-        while second.pairp():
-            s += " " + str(second.car())
-            second = second.cdr()
-        if not second.nullp():
-            s += " . " + str(second)
-        return s + ")"
+        while type(second) is Pair:
+            items.append(str(second.first))
+            second = second.second
+        if second is not nil:
+            items += (".", str(second))
+        return "(" + " ".join(items) + ")"
+
+    def as_tuple(self):
+        """The elements of this well-formed list as a Python tuple.  The
+        tuple is built on first use and cached until a Pair is mutated, which
+        makes repeated walks over program text (argument lists, bodies) cheap.
+
+        >>> s = Pair(1, Pair(2, Pair(3, nil)))
+        >>> s.as_tuple()
+        (scnum(1), scnum(2), scnum(3))
+        >>> s.second.set_cdr(nil)
+        okay
+        >>> s.as_tuple()
+        (scnum(1), scnum(2))
+        """
+        cache = self._tuple
+        if cache is not None and cache[0] == _pair_mutations:
+            return cache[1]
+        # A single walk both collects the elements and, with a second
+        # pointer moving at half speed, detects a circular list.
+        items, p, slow = [], self, self
+        while type(p) is Pair:
+            items.append(p.first)
+            p = p.second
+            if not len(items) & 1:
+                slow = slow.second
+                if slow is p:
+                    raise SchemeError("ill-formed list")
+        if p is not nil:
+            raise SchemeError("ill-formed list")
+        elements = tuple(items)
+        self._tuple = (_pair_mutations, elements)
+        return elements
+
+    def lowered(self, lower):
+        """LOWER(self), a preprocessed form of this list, cached like
+        as_tuple until a Pair is mutated.  Each list caches one lowering, so
+        only one function may be used as LOWER for a given list."""
+        cache = self._lowered
+        if cache is not None and cache[0] == _pair_mutations:
+            return cache[1]
+        result = lower(self)
+        self._lowered = (_pair_mutations, result)
+        return result
 
     def __len__(self):
-        if not self._list_end().nullp():
+        try:
+            return len(self.as_tuple())
+        except SchemeError:
             raise SchemeError("length attempted on improper list")
-        n, second = 1, self.second
-        while second.pairp():
-            n += 1
-            second = second.second
-        return n
 
     def __getitem__(self, k):
         if k < 0:
@@ -583,32 +728,59 @@ class Pair(SchemeValue):
         return y.first
 
     def __eq__(self, p):
-        if not isinstance(p, Pair):
-            return False
-        return bool(self.first.equalp(p.first) and self.second.equalp(p.second))
+        # Walk the two spines together, so that long lists do not recurse.
+        x = self
+        while isinstance(p, Pair):
+            if not x.first.equalp(p.first):
+                return False
+            x, p = x.second, p.second
+            if type(x) is not Pair:
+                return bool(x.equalp(p))
+        return False
 
     def map(self, fn):
         """Return a Scheme list after mapping Python function FN to SELF."""
-        mapped = fn(self.first)
-        if self.second.nullp() or self.second.pairp():
-            return Pair(mapped, self.second.map(fn))
-        else:
+        mapped, p = [], self
+        while type(p) is Pair:
+            mapped.append(scheme_coerce(fn(p.first)))
+            p = p.second
+        if p is not nil:
             raise SchemeError("ill-formed list")
+        result = nil
+        for val in reversed(mapped):
+            result = _cons(val, result)
+        return result
 
     def append(self, y):
         if not self.listp():
             raise SchemeError("attempt to append to improper list")
-        result = last = Pair(self.first, y)
-        p = self.second
+        items, p = [], self
         while p is not nil:
-            last.second = Pair(p.first, y)
-            last = last.second
+            items.append(p.first)
             p = p.second
+        result = scheme_coerce(y)
+        for item in reversed(items):
+            result = _cons(item, result)
         return result
 
+# The number of times set_car or set_cdr has changed a Pair.
+_pair_mutations = 0
+
+def _cons(first, second):
+    """The pair (FIRST . SECOND), where both are already SchemeValues.  For
+    the interpreter's own list building; unlike Pair, does no coercion."""
+    p = Pair.__new__(Pair)
+    p.first = first
+    p.second = second
+    p._tuple = None
+    p._lowered = None
+    return p
+
 class nil(SchemeValue):
     """The empty list"""
 
+    __slots__ = ()
+
     def listp(self):
         return scheme_true
 
@@ -616,7 +788,7 @@ class nil(SchemeValue):
         return scheme_true
 
     def length(self):
-        return SchemeInt(0)
+        return scint(0)
 
     def __repr__(self):
         return "nil"
@@ -627,6 +799,9 @@ class nil(SchemeValue):
     def __len__(self):
         return 0
 
+    def as_tuple(self):
+        return ()
+
     def __getitem__(self, k):
         if k < 0:
             raise IndexError("negative index into list")
@@ -645,6 +820,7 @@ nil = nil() # Assignment hides the nil class; there is only one instance
 ########################
 
 _PRIMITIVES = []
+_PRIMITIVES_BY_NAME = {}
 
 def primitive(*names):
     """An annotation to record a Python function as a primitive procedure.
@@ -652,6 +828,8 @@ def primitive(*names):
     the function."""
     def add(fn):
         _PRIMITIVES.append((names, fn))
+        for name in names:
+            _PRIMITIVES_BY_NAME[name] = fn
         return fn
     return add
 
@@ -660,10 +838,42 @@ def get_primitive_bindings():
     annotations."""
     return _PRIMITIVES
 
+def get_primitive_by_name(name):
+    """The function recorded by @primitive under the Scheme name NAME, or
+    None if there is none.
+
+    >>> get_primitive_by_name("car") is scheme_car
+    True
+    """
+    return _PRIMITIVES_BY_NAME.get(name)
+
+# The type predicates below answer from the type of their argument alone.
+# For each of the interpreter's own value types, their answers are looked up
+# in a table by type; other types (procedures, for example) fall back to
+# calling the predicate method.
+
+_SAMPLE_VALUES = (okay, scheme_true, scheme_false, scint(0), scfloat(0.5),
+                  SchemeSymbol("x"), scstr(""), _cons(nil, nil), nil)
+
+def _type_table(method):
+    """A dict from each type in _SAMPLE_VALUES to the result of METHOD, the
+    name of a type predicate, on values of that type."""
+    return {type(v): getattr(v, method)() for v in _SAMPLE_VALUES}
+
+_BOOLEANP = _type_table("booleanp")
+_PAIRP = _type_table("pairp")
+_NULLP = _type_table("nullp")
+_STRINGP = _type_table("stringp")
+_SYMBOLP = _type_table("symbolp")
+_NUMBERP = _type_table("numberp")
+_INTEGERP = _type_table("integerp")
+_ATOMP = _type_table("atomp")
+
 @primitive("boolean?")
 def scheme_booleanp(x):
     """True iff X is #t or #f."""
-    return x.booleanp()
+    result = _BOOLEANP.get(type(x))
+    return x.booleanp() if result is None else result
 
 @primitive("not")
 def scheme_not(x):
@@ -684,11 +894,13 @@ def scheme_equalp(x, y):
 
 @primitive("pair?")
 def scheme_pairp(x):
-    return x.pairp()
+    result = _PAIRP.get(type(x))
+    return x.pairp() if result is None else result
 
 @primitive("null?")
 def scheme_nullp(x):
-    return x.nullp()
+    result = _NULLP.get(type(x))
+    return x.nullp() if result is None else result
 
 @primitive("list?")
 def scheme_listp(x):
@@ -704,18 +916,18 @@ def scheme_cons(x, y):
 
 @primitive("car")
 def scheme_car(x):
-    return x.car()
+    return x.first if type(x) is Pair else x.car()
 
 @primitive("cdr")
 def scheme_cdr(x):
-    return x.cdr()
+    return x.second if type(x) is Pair else x.cdr()
 
 
 @primitive("list")
 def scheme_list(*vals):
     result = nil
-    for i in range(len(vals)-1, -1, -1):
-        result = scheme_cons(vals[i], result)
+    for val in reversed(vals):
+        result = _cons(val, result)
     return result
 
 @primitive("append")
@@ -723,25 +935,29 @@ def scheme_append(*vals):
     if len(vals) == 0:
         return nil
     result = vals[-1]
-    for i in range(len(vals)-2, -1, -1):
-        result = vals[i].append(result)
+    for val in reversed(vals[:-1]):
+        result = val.append(result)
     return result
 
 @primitive("string?")
 def scheme_stringp(x):
-    return x.stringp()
+    result = _STRINGP.get(type(x))
+    return x.stringp() if result is None else result
 
 @primitive("symbol?")
 def scheme_symbolp(x):
-    return x.symbolp()
+    result = _SYMBOLP.get(type(x))
+    return x.symbolp() if result is None else result
 
 @primitive("number?")
 def scheme_numberp(x):
-    return x.numberp()
+    result = _NUMBERP.get(type(x))
+    return x.numberp() if result is None else result
 
 @primitive("integer?")
 def scheme_integerp(x):
-    return x.integerp()
+    result = _INTEGERP.get(type(x))
+    return x.integerp() if result is None else result
 
 def _check_nums(*vals):
     """Check that all arguments in VALS are numbers."""
@@ -750,6 +966,17 @@ def _check_nums(*vals):
             msg = "operand {0} ({1}) is not a number"
             raise SchemeError(msg.format(i, v))
 
+def _check_num1(v0):
+    """_check_nums for a single value, without packing it into a tuple."""
+    if type(v0) not in _NUMBER_TYPES and not scheme_numberp(v0):
+        _check_nums(v0)
+
+def _check_num2(v0, v1):
+    """_check_nums for two values, without packing them into a tuple."""
+    if ((type(v0) not in _NUMBER_TYPES or type(v1) not in _NUMBER_TYPES)
+        and not (scheme_numberp(v0) and scheme_numberp(v1))):
+        _check_nums(v0, v1)
+
 def _arith(fn, init, vals):
     """Perform the fn operation on the number values of VALS, with INIT as
     the value when VALS is empty. Returns the result as a Scheme value."""
@@ -757,24 +984,33 @@ def _arith(fn, init, vals):
     s = init
     for val in vals:
         s = fn(s, val)
-    if round(s) == s:
-        return SchemeInt(round(s))
-    else:
-        return SchemeFloat(s)
+    return scnum(s)
 
 @primitive("+")
 def scheme_add(*vals):
-    return _arith(operator.add, 0, vals)
+    for val in vals:
+        if type(val) is not SchemeInt:
+            return _arith(operator.add, 0, vals)
+    return scint(sum(vals))
 
 @primitive("-")
 def scheme_sub(val0, *vals):
     if len(vals) == 0:
         return val0.neg()
+    if type(val0) is SchemeInt:
+        for val in vals:
+            if type(val) is not SchemeInt:
+                break
+        else:
+            return scint(functools.reduce(operator.sub, vals, val0))
     return _arith(operator.sub, val0, vals)
 
 @primitive("*")
 def scheme_mul(*vals):
-    return _arith(operator.mul, 1, vals)
+    for val in vals:
+        if type(val) is not SchemeInt:
+            return _arith(operator.mul, 1, vals)
+    return scint(math.prod(vals))
 
 @primitive("/")
 def scheme_div(*vals):
@@ -789,14 +1025,20 @@ def scheme_div(*vals):
 
 @primitive("quotient")
 def scheme_quo(val0, val1):
+    if type(val0) is SchemeInt and type(val1) is SchemeInt:
+        return _int_quo(val0, val1)
     return val0.quo(val1)
 
 @primitive("modulo")
 def scheme_modulo(val0, val1):
+    if type(val0) is SchemeInt and type(val1) is SchemeInt:
+        return _int_modulo(val0, val1)
     return val0.modulo(val1)
 
 @primitive("remainder")
 def scheme_rem(val0, val1):
+    if type(val0) is SchemeInt and type(val1) is SchemeInt:
+        return _int_rem(val0, val1)
     return val0.rem(val1)
 
 @primitive("floor")
@@ -809,22 +1051,32 @@ def scheme_ceil(val):
 
 @primitive("=")
 def scheme_eq(x, y):
+    if type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES:
+        return scheme_true if x == y else scheme_false
     return x.eq(y)
 
 @primitive("<")
 def scheme_lt(x, y):
+    if type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES:
+        return scheme_true if x < y else scheme_false
     return x.ltp(y)
 
 @primitive(">")
 def scheme_gt(x, y):
+    if type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES:
+        return scheme_true if x > y else scheme_false
     return x.gtp(y)
 
 @primitive("<=")
 def scheme_le(x, y):
+    if type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES:
+        return scheme_true if x <= y else scheme_false
     return x.lep(y)
 
 @primitive(">=")
 def scheme_ge(x, y):
+    if type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES:
+        return scheme_true if x >= y else scheme_false
     return x.gep(y)
 
 @primitive("even?")
@@ -846,7 +1098,8 @@ def scheme_zerop(x):
 # atom? is not standard.
 @primitive("atom?")
 def scheme_atomp(x):
-    return x.atomp()
+    result = _ATOMP.get(type(x))
+    return x.atomp() if result is None else result
 
 @primitive("display")
 def scheme_display(val):
@@ -892,7 +1145,7 @@ def _tscheme_prep():
 @primitive("forward", "fd")
 def tscheme_forward(n):
     """Move the turtle forward a distance N units on the current heading."""
-    _check_nums(n)
+    _check_num1(n)
     _tscheme_prep()
     turtle.forward(n)
     return okay
@@ -901,7 +1154,7 @@ def tscheme_forward(n):
 def tscheme_backward(n):
     """Move the turtle backward a distance N units on the current heading,
     without changing direction."""
-    _check_nums(n)
+    _check_num1(n)
     _tscheme_prep()
     turtle.backward(n)
     return okay
@@ -909,7 +1162,7 @@ def tscheme_backward(n):
 @primitive("left", "lt")
 def tscheme_left(n):
     """Rotate the turtle's heading N degrees counterclockwise."""
-    _check_nums(n)
+    _check_num1(n)
     _tscheme_prep()
     turtle.left(n)
     return okay
@@ -917,7 +1170,7 @@ def tscheme_left(n):
 @primitive("right", "rt")
 def tscheme_right(n):
     """Rotate the turtle's heading N degrees clockwise."""
-    _check_nums(n)
+    _check_num1(n)
     _tscheme_prep()
     turtle.right(n)
     return okay
@@ -930,9 +1183,9 @@ def tscheme_circle(r, extent = None):
     and otherwise counterclockwise, leaving the turtle facing along the
     arc at its end."""
     if extent is None:
-        _check_nums(r)
+        _check_num1(r)
     else:
-        _check_nums(r, extent)
+        _check_num2(r, extent)
     _tscheme_prep()
     turtle.circle(r, extent and extent)
     return okay
@@ -940,7 +1193,7 @@ def tscheme_circle(r, extent = None):
 @primitive("setposition", "setpos", "goto")
 def tscheme_setposition(x, y):
     """Set turtle's position to (X,Y), heading unchanged."""
-    _check_nums(x, y)
+    _check_num2(x, y)
     _tscheme_prep()
     turtle.setposition(x, y)
     return okay
@@ -948,7 +1201,7 @@ def tscheme_setposition(x, y):
 @primitive("setheading", "seth")
 def tscheme_setheading(h):
     """Set the turtle's heading H degrees clockwise from north (up)."""
-    _check_nums(h)
+    _check_num1(h)
     _tscheme_prep()
     turtle.setheading(h)
     return okay
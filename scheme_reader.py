@@ -15,16 +15,21 @@ The __str__ method of a Scheme value will return a Scheme expression that
 would be read to the value, where possible.
 """
 
+import ast
+import sys
+
 from ucb import main, trace, interact
-from scheme_primitives import Pair, nil, intern, scnum, scstr, scbool
-from scheme_tokens import tokenize_lines, DELIMITERS
+from scheme_primitives import Pair, nil, intern, scnum, scint, scstr
+from scheme_primitives import SchemeSymbol, scheme_true, scheme_false, _cons
+from scheme_tokens import tokenize_lines, DELIMITERS, StringToken
 from buffer import Buffer, InputReader, LineReader
 
 # Scheme list parser
 
 
-def scheme_read(src):
-    """Read the next expression from SRC, a Buffer of tokens.
+def scheme_read(src, _type=type, _scint=scint, _SchemeSymbol=SchemeSymbol):
+    """Read the next expression from SRC, a Buffer of tokens.  (The other
+    parameters only make the names used for every token local.)
 
     >>> lines = ["(+ 1 ", "(+ 23 4)) ("]
     >>> src = Buffer(tokenize_lines(lines))
@@ -35,29 +40,37 @@ def scheme_read(src):
     >>> print(read_line("(car '(1 2))"))
     (car (quote (1 2)))
     """
-    if src.current() is None:
-        raise EOFError
-    val = src.pop()
-    if val == "nil":
-        return nil
-    elif type(val) is int or type(val) is float:
+    # Take the token straight from the Buffer's current line, letting the
+    # Buffer itself fetch a line only when that one is used up.
+    line, index = src.current_line, src.index
+    if index >= len(line):
+        if src.current() is None:
+            raise EOFError
+        line, index = src.current_line, 0
+    val = line[index]
+    src.index = index + 1
+    reader = _TOKEN_READERS.get(val)
+    if reader is not None:
+        return reader(src)
+    elif _type(val) is _SchemeSymbol:
+        # The tokenizer has already interned it.
+        return val
+    elif _type(val) is int:
+        return _scint(val)
+    elif _type(val) is float:
         return scnum(val)
-    elif type(val) is bool:
-        return scbool(val)
-    elif val not in DELIMITERS:
-        if val[0] == '"':
-            return scstr(eval(val))
-        else:
-            return intern(val)
-    elif val == "'":
-        return Pair('quote', Pair(scheme_read(src), nil))
-    elif val == "(":
-        return read_tail(src)
+    elif _type(val) is bool:
+        return scheme_true if val else scheme_false
+    elif _type(val) is StringToken:
+        return scstr(decode_string(val))
     else:
-        raise SyntaxError("unexpected token: {0}".format(val))
+        # Every delimiter has an entry in _TOKEN_READERS, so VAL is the name
+        # of a symbol, from a source of tokens other than tokenize_lines.
+        return intern(val)
 
-def read_tail(src):
+def read_tail(src, _cons=_cons, _nil=nil):
     """Return the remainder of a list in SRC, starting before an element or ).
+    (The other parameters only make the names used for every element local.)
 
     >>> read_tail(Buffer(tokenize_lines([")"])))
     nil
@@ -77,24 +90,115 @@ def read_tail(src):
     Pair(1, Pair(2, Pair('quote', Pair(Pair(3, Pair(4, nil)), nil))))
     >>> read_line("((1 1 . 2) . 1)")
     Pair(Pair(1, Pair(1, 2)), 1)
+    >>> len(read_line("(" + "1 " * 10000 + ")"))
+    10000
     """
-    try:
-        if src.current() is None:
-            raise SyntaxError("unexpected end of file")
-        if src.current() == ")":
-            src.pop()
-            return nil
-        if src.current() == ".":           
-            src.pop()
-            first = scheme_read(src)
-            if read_tail(src) is nil:
-                return first
-            raise SyntaxError("Expected one element after .")        
-        first = scheme_read(src)
-        rest = read_tail(src)
-        return Pair(first, rest)
-    except EOFError:
+    # The list is built front to back, each new Pair becoming the second
+    # of the last, after a placeholder HEAD.
+    head = last = _cons(_nil, _nil)
+    while True:
+        # As in scheme_read, look at the next token in place when possible.
+        line, index = src.current_line, src.index
+        if index >= len(line):
+            if src.current() is None:
+                raise SyntaxError("unexpected end of file")
+            line, index = src.current_line, 0
+        current = line[index]
+        if current == ")":
+            src.index = index + 1
+            break
+        if current == ".":
+            src.index = index + 1
+            last.set_cdr(read_next(src))
+            if read_tail(src) is not _nil:
+                raise SyntaxError("Expected one element after .")
+            break
+        cell = _cons(scheme_read(src), _nil)
+        last.set_cdr(cell)
+        last = cell
+    return head.second
+
+def read_next(src):
+    """Read the expression in SRC that must follow the token just popped.
+    Unlike scheme_read, which raises EOFError when there is nothing left to
+    read, this raises a SyntaxError, since SRC ends in mid-expression.
+
+    >>> read_line("'")
+    Traceback (most recent call last):
+        ...
+    SyntaxError: unexpected end of file
+    """
+    if src.current() is None:
         raise SyntaxError("unexpected end of file")
+    return scheme_read(src)
+
+def decode_string(token):
+    r"""The string denoted by TOKEN, a double-quoted literal that may contain
+    Python escape sequences.
+
+    >>> print(decode_string(r'"say \"hi\"\nbye"'))
+    say "hi"
+    bye
+    >>> print(decode_string(r'"\日\n本"'))
+    \日
+    本
+    >>> decode_string(r'"\x4"')
+    Traceback (most recent call last):
+        ...
+    SyntaxError: (unicode error) 'unicodeescape' codec can't decode bytes in position 0-2: truncated \xXX escape
+    """
+    try:
+        raw = token[1:-1].encode('latin-1')
+    except UnicodeEncodeError:
+        # unicode_escape reads its input as Latin-1, so leave text with other
+        # characters to Python's own parser for string literals.
+        return ast.literal_eval(token)
+    try:
+        return raw.decode('unicode_escape')
+    except UnicodeDecodeError as err:
+        raise SyntaxError('(unicode error) ' + str(err)) from err
+
+def quotation_reader(symbol):
+    """Return a reader for a quotation mark that abbreviates SYMBOL: given
+    the Buffer just past the mark, it returns (SYMBOL <expression>) for the
+    expression that follows.
+
+    >>> read_line("`(a ,b ,@c)")
+    Pair('quasiquote', Pair(Pair('a', Pair(Pair('unquote', Pair('b', nil)), Pair(Pair('unquote-splicing', Pair('c', nil)), nil))), nil))
+    >>> print(read_line("`(a ,b ,@c)"))
+    (quasiquote (a (unquote b) (unquote-splicing c)))
+    >>> body = read_line("`(a ,b ,@c)").second.first
+    >>> body[1].first is intern("unquote"), body[2].first is intern("unquote-splicing")
+    (True, True)
+    >>> print(read_line("`(a `(b ,(c ,@d)))"))
+    (quasiquote (a (quasiquote (b (unquote (c (unquote-splicing d)))))))
+    """
+    def read_quotation(src):
+        return _cons(symbol, _cons(read_next(src), nil))
+    return read_quotation
+
+read_quote = quotation_reader(intern("quote"))
+
+# The readers for the tokens that begin expressions of their own, each
+# called with the Buffer just past that token.
+_TOKEN_READERS = {
+    "nil": lambda src: nil,
+    "'": read_quote,
+    "`": quotation_reader(intern("quasiquote")),
+    ",": quotation_reader(intern("unquote")),
+    ",@": quotation_reader(intern("unquote-splicing")),
+    "(": read_tail,
+}
+
+def unexpected_token(token):
+    """Return a reader for TOKEN, a delimiter that cannot begin an
+    expression, which raises a SyntaxError."""
+    def read_unexpected(src):
+        raise SyntaxError("unexpected token: {0}".format(token))
+    return read_unexpected
+
+for _token in DELIMITERS:
+    _TOKEN_READERS.setdefault(_token, unexpected_token(_token))
 
 # Convenience methods
 
@@ -119,13 +223,13 @@ def read_line(line):
 @main
 def read_print_loop():
     """Run a read-print loop for Scheme expressions."""
+    write = sys.stdout.write
     while True:
         try:
             src = buffer_input("read> ")
             while src.more_on_line:
                 expression = scheme_read(src)
-                print(expression)
-                print(repr(expression))
+                write("{0}\n{1!r}\n".format(str(expression), expression))
         except (SyntaxError, ValueError) as err:
             print(type(err).__name__ + ":", err)
         except (KeyboardInterrupt, EOFError):  # <Control>-D, etc.
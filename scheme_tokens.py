@@ -5,7 +5,8 @@ of tokens.  A token may be:
 
   * A number (represented as an int or float)
   * A boolean (represented as a bool)
-  * A symbol (represented as a string)
+  * A symbol (represented as the SchemeSymbol that intern returns)
+  * A string literal, quotes and all (represented as a StringToken)
   * A delimiter, including parentheses, dots, and single quotes
 
 This file also includes some features of Scheme that have not been addressed
@@ -13,6 +14,8 @@ in the course, such as quasiquoting and Scheme strings.
 """
 
 from ucb import main
+from scheme_primitives import intern
+import functools
 import itertools
 import string
 import sys
@@ -25,7 +28,12 @@ _STRING_DELIMS = set('"')
 _WHITESPACE = set(' \t\n\r')
 _SINGLE_CHAR_TOKENS = set("()'`")
 _TOKEN_END = _WHITESPACE | _SINGLE_CHAR_TOKENS | _STRING_DELIMS | {',', ',@'}
-DELIMITERS = _SINGLE_CHAR_TOKENS | {'.', ',', ',@'}
+DELIMITERS = frozenset(_SINGLE_CHAR_TOKENS | {'.', ',', ',@'})
+
+class StringToken(str):
+    """The text of a string literal token, including its quotes.  Its type
+    tells it apart from a symbol without inspecting its text."""
+    __slots__ = ()
 
 def valid_symbol(s):
     """Returns whether s is not a well-formed value."""
@@ -74,7 +82,15 @@ def next_candidate_token(line, k):
 
 def tokenize_line(line):
     """The list of Scheme tokens on line.  Excludes comments and whitespace."""
-    result = []
+    return list(_line_tokens(line))
+
+@functools.lru_cache(maxsize=1024)
+def _scan_line(line):
+    """The tokens on LINE as a tuple, and the invalid tokens on it as a tuple
+    of (text, position) pairs.  Both are immutable, so lines read again, as
+    when a file is loaded more than once, share one result rather than being
+    tokenized anew."""
+    result, invalid = [], []
     text, i = next_candidate_token(line, 0)
     while text is not None:
         if text in DELIMITERS:
@@ -83,8 +99,8 @@ def tokenize_line(line):
             result.append(True)
         elif text == '#f' or text.lower() == 'false':
             result.append(False)
-        elif text == 'nil':
-            result.append(text)
+        elif text.lower() == 'nil':
+            result.append('nil')
         elif text[0] in _SYMBOL_CHARS:
             number = False
             if text[0] in _NUMERAL_STARTS:
@@ -99,22 +115,31 @@ def tokenize_line(line):
                         pass
             if not number:
                 if valid_symbol(text):
-                    result.append(text.lower())
+                    result.append(intern(text.lower()))
                 else:
                     raise ValueError("invalid numeral or symbol: {0}".format(text))
         elif text[0] in _STRING_DELIMS:
-            result.append(text)
+            result.append(StringToken(text))
         else:
-            print("warning: invalid token: {0}".format(text), file=sys.stderr)
-            print("    ", line, file=sys.stderr)
-            print(" " * (i+3), "^", file=sys.stderr)
+            invalid.append((text, i))
         text, i = next_candidate_token(line, i)
-    return result
+    return tuple(result), tuple(invalid)
+
+def _line_tokens(line):
+    """The tokens on LINE as a tuple, after warning about any invalid ones.
+    Warnings are printed each time LINE is read, even when its tokens come
+    from the cache in _scan_line."""
+    tokens, invalid = _scan_line(line)
+    for text, i in invalid:
+        print("warning: invalid token: {0}".format(text), file=sys.stderr)
+        print("    ", line, file=sys.stderr)
+        print(" " * (i+3), "^", file=sys.stderr)
+    return tokens
 
 def tokenize_lines(input):
-    """An iterator that returns lists of tokens, one for each line of the
+    """An iterator that returns sequences of tokens, one for each line of the
     iterable input sequence."""
-    return map(tokenize_line, input)
+    return map(_line_tokens, input)
 
 def count_tokens(input):
     """Count the number of non-delimiter tokens in input."""
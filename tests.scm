@@ -29,6 +29,9 @@
 (let ((x 1) (x 2) (y 3)) (+ x y))
 ;expect Error:duplicate bindings
 
+(null? NIL)
+; expect #t
+
 (define f (mu (x) (+ x y)))
 (define g (lambda (x y) (f (+ x x))))
 (g 6 4)
@@ -90,6 +93,12 @@ a
   (else "x does not equal 1 or 2"))
 ;expect "x does not equal 1 or 2"
 
+"a\"b"
+; expect "a\"b"
+
+"x. y"
+; expect "x. y"
+
 (define (map proc items)
   (if (null? items)
       nil